@@ -28,6 +28,10 @@ class SimpleStreamingCamera:
         self.photo_count = 0
         self.platform_type = platform.system().lower()
         
+        # Overlay timestamp cache (formatted once per second, not per frame)
+        self._overlay_second = -1
+        self._overlay_text = ""
+        
         # Camera settings for food monitoring
         self.width = CAMERA_SETTINGS['DEFAULT_WIDTH']
         self.height = CAMERA_SETTINGS['DEFAULT_HEIGHT']
@@ -173,7 +177,7 @@ class SimpleStreamingCamera:
                 frame, analytics = self.ai_processor.process_frame(frame)
                 
                 # Add timestamp overlay
-                timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+                timestamp = self._overlay_timestamp()
                 cv2.putText(frame, timestamp, (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 
                            0.7, (255, 255, 255), 2)
                 
@@ -217,6 +221,14 @@ class SimpleStreamingCamera:
         
         logger.info("Video streaming stopped")
     
+    def _overlay_timestamp(self):
+        """Frame overlay timestamp - strftime runs once per wall-clock second"""
+        now = int(time.time())
+        if now != self._overlay_second:
+            self._overlay_second = now
+            self._overlay_text = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(now))
+        return self._overlay_text
+    
     def get_latest_frame(self):
         """ดึงเฟรมล่าสุด"""
         try:
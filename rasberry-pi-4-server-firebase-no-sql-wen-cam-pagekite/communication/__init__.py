@@ -7,11 +7,12 @@ from .arduino_comm import (
 )
 from .firebase_comm import (
     init_firebase, 
+    close_firebase, 
     setup_firebase_listeners, 
     update_firebase_sensors
 )
 
 __all__ = [
     'auto_detect_arduino_port', 'connect_arduino', 'read_arduino_data', 'send_arduino_command',
-    'init_firebase', 'setup_firebase_listeners', 'update_firebase_sensors'
+    'init_firebase', 'close_firebase', 'setup_firebase_listeners', 'update_firebase_sensors'
 ] 
\ No newline at end of file
@@ -3,17 +3,64 @@
 """Arduino Communication Module"""
 
 import os
+import re
 import time
 import serial
 import orjson
 import logging
+import threading
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 
 from config import config
 from system.state_manager import state
+from database.local_json_db import local_db
 
 logger = logging.getLogger(__name__)
 
+# Byte strings that identify the fish feeder firmware during auto-detection
+# (one alternation - a single scan of the buffer instead of one per keyword)
+ARDUINO_SIGNATURE_RE = re.compile(rb'FISH FEEDER|ARDUINO|timestamp|sensors')
+
+def _probe_port(port, answered, higher_priority):
+    """Open `port` and return the Serial if the fish feeder firmware answers, else None
+    
+    Gives up as soon as any port in `higher_priority` (Events of earlier
+    candidates) has answered - and then never opens the port, since opening
+    toggles DTR and resets whatever board sits on it.
+    """
+    def outranked():
+        return any(event.is_set() for event in higher_priority)
+    
+    if outranked():
+        return None
+    
+    ser = None
+    try:
+        ser = serial.Serial(port, config.ARDUINO_BAUDRATE, timeout=0.1)
+        
+        # Arduino sends startup text first, then JSON - read as it arrives
+        # and stop as soon as a signature shows up (2s startup budget)
+        received = bytearray()
+        deadline = time.monotonic() + 2.1
+        while time.monotonic() < deadline and not outranked():
+            received += ser.read(ser.in_waiting or 1)
+            
+            # Look for Arduino signatures
+            if ARDUINO_SIGNATURE_RE.search(received):
+                answered.set()
+                logger.info(f"Arduino found on port: {port}")
+                logger.info(f"Arduino response sample: {received[:200].decode('utf-8', errors='replace')}...")
+                return ser
+        ser.close()
+        
+    except (serial.SerialException, OSError):
+        # Don't leave a half-probed port open (blocks the next connect)
+        if ser:
+            ser.close()
+    
+    return None
+
 def auto_detect_arduino_port():
     """Auto-detect Arduino port on Windows/Linux"""
     # Priority: COM3 first (tested working), then other ports
@@ -25,34 +72,53 @@ def auto_detect_arduino_port():
             if f'COM{i}' not in possible_ports:
                 possible_ports.append(f'COM{i}')
     
-    for port in possible_ports:
-        try:
-            ser = serial.Serial(port, config.ARDUINO_BAUDRATE, timeout=0.1)
-            time.sleep(0.1)  # Ultra fast Arduino reset wait
-            
-            # Arduino sends startup text first, then JSON - wait longer
-            time.sleep(2)  # Wait for Arduino startup sequence
-            
-            # Check for any data (startup text or JSON)
-            if ser.in_waiting > 0:
-                try:
-                    # Read multiple lines to catch startup sequence
-                    all_data = ser.read_all().decode('utf-8', errors='ignore')
-                    
-                    # Look for Arduino signatures
-                    if any(keyword in all_data for keyword in ['FISH FEEDER', 'ARDUINO', 'timestamp', 'sensors']):
-                        logger.info(f"Arduino found on port: {port}")
-                        logger.info(f"Arduino response sample: {all_data[:200]}...")
-                        return ser, port
-                except UnicodeDecodeError:
-                    # Skip ports with non-UTF8 data
-                    continue
-            ser.close()
-            
-        except (serial.SerialException, OSError):
+    # COM3 is also listed in config - two probes must never open the same port
+    possible_ports = list(dict.fromkeys(possible_ports))
+    
+    # Each probe waits up to 2s on its own tty - probe them all at once.
+    # A port that answers stops only the lower-priority probes, so the
+    # result is the same port a one-by-one scan in this order would pick
+    answered = [threading.Event() for _ in possible_ports]
+    with ThreadPoolExecutor(max_workers=min(8, len(possible_ports))) as pool:
+        probes = [pool.submit(_probe_port, port, answered[i], answered[:i])
+                  for i, port in enumerate(possible_ports)]
+    
+    result = (None, None)
+    for port, probe in zip(possible_ports, probes):
+        ser = probe.result()
+        if ser is None:
             continue
+        if result[0] is None:
+            result = (ser, port)  # Highest-priority port that answered
+        else:
+            ser.close()
+    
+    return result
+
+def _enable_low_latency(ser):
+    """Disable USB-serial driver buffering so small JSON lines arrive immediately (Linux)"""
+    # pyserial exposes TIOCGSERIAL/TIOCSSERIAL ASYNC_LOW_LATENCY on Linux
+    set_low_latency = getattr(ser, 'set_low_latency_mode', None)
+    if set_low_latency:
+        try:
+            set_low_latency(True)
+            logger.info(f"Serial low-latency mode enabled on {ser.port}")
+            return True
+        except (IOError, OSError, ValueError) as e:
+            logger.debug(f"ASYNC_LOW_LATENCY not supported on {ser.port}: {e}")
+    
+    # FTDI fallback: shrink the 16 ms latency timer via sysfs (needs write access)
+    latency_timer = f"/sys/bus/usb-serial/devices/{os.path.basename(str(ser.port))}/latency_timer"
+    if os.path.exists(latency_timer):
+        try:
+            with open(latency_timer, 'w') as f:
+                f.write('1')
+            logger.info(f"FTDI latency timer set to 1 ms on {ser.port}")
+            return True
+        except OSError as e:
+            logger.debug(f"Cannot write {latency_timer}: {e}")
     
-    return None, None
+    return False
 
 def connect_arduino():
     """Connect to Arduino with auto-detection"""
@@ -60,6 +126,10 @@ def connect_arduino():
     state.arduino_serial, port = auto_detect_arduino_port()
     
     if state.arduino_serial:
+        # Block in the kernel until a line arrives instead of polling in_waiting
+        state.arduino_serial.timeout = config.ARDUINO_READ_TIMEOUT
+        state.serial_rx_buffer.clear()
+        _enable_low_latency(state.arduino_serial)
         state.arduino_connected = True
         state.reconnect_attempts = 0
         state.last_arduino_response = time.time()  # Track last response time
@@ -78,14 +148,13 @@ def check_arduino_connection():
         current_time = time.time()
         
         # Check if we haven't received data for more than 5 seconds
-        if hasattr(state, 'last_arduino_response'):
-            time_since_last_response = current_time - state.last_arduino_response
-            if time_since_last_response > 5 and state.arduino_connected:
-                logger.warning(f"⚠️  Arduino silent for {time_since_last_response:.1f}s - connection may be lost")
-                state.arduino_connected = False
-                if state.arduino_serial:
-                    state.arduino_serial.close()
-                    state.arduino_serial = None
+        time_since_last_response = current_time - state.last_arduino_response
+        if time_since_last_response > 5 and state.arduino_connected:
+            logger.warning(f"⚠️  Arduino silent for {time_since_last_response:.1f}s - connection may be lost")
+            state.arduino_connected = False
+            if state.arduino_serial:
+                state.arduino_serial.close()
+                state.arduino_serial = None
         
         # Auto-reconnect if disconnected
         if not state.arduino_connected:
@@ -112,83 +181,76 @@ def read_arduino_data():
         if state.arduino_serial.in_waiting > 2048:  # 2KB buffer limit
             logger.warning("Serial buffer overflow detected, clearing...")
             state.arduino_serial.reset_input_buffer()
+            state.serial_rx_buffer.clear()
             return None
             
-        if state.arduino_serial.in_waiting > 0:
-            line = state.arduino_serial.readline().decode('utf-8', errors='ignore').strip()
-            
-            # Skip non-JSON lines instantly (menu text, etc.)
-            if not line or not line.startswith('{'):
-                return None
-                
-            # Parse JSON data
-            try:
-                arduino_data = orjson.loads(line)
-                
-                # Update last response time for connection monitoring
-                state.last_arduino_response = time.time()
-                
-                # Update system state
-                state.update_sensor_data(arduino_data)
-                
-                # Smart Data Change Detection (avoid duplicate processing)
-                unified_data = state.get_unified_data()
-                data_hash = hash(str(unified_data))
-                if hasattr(state, 'last_data_hash') and state.last_data_hash == data_hash:
-                    return unified_data  # Same data, skip heavy processing
-                state.last_data_hash = data_hash
-                
-                # Process camera commands from Arduino
-                if 'command' in arduino_data:
-                    command = arduino_data['command']
-                    if command == 'start_camera_recording':
-                        logger.info("Arduino requested camera recording start")
-                        from camera.streaming import camera
-                        if not camera.is_streaming:
-                            import threading
-                            threading.Thread(target=camera.generate_stream, daemon=True).start()
-                        # Take a photo to mark feeding start
-                        camera.take_photo()
-                        
-                    elif command == 'stop_camera_recording':
-                        logger.info("Arduino requested camera recording stop")
-                        from camera.streaming import camera
-                        # Take a final photo to mark feeding end
-                        camera.take_photo()
-                        # Note: We keep streaming running for web interface
-                
-                # Smart logging for sensor data (avoid spam in quiet mode)
-                if not getattr(config, 'HIDE_SENSOR_DATA', False):
-                    weight = unified_data.get('weight_kg', 0)
-                    temp = unified_data.get('temp_feed_tank', 0)
-                    battery = unified_data.get('battery_percent', 0)
-                    logger.info(f"Arduino data parsed: Weight={weight}kg, Temp={temp}°C, Battery={battery}%")
-                
-                # Process feeding status updates
-                if 'feeding_status' in arduino_data:
-                    feeding_status = arduino_data['feeding_status']
-                    logger.info(f"Feeding status: {feeding_status}")
-                    
-                    # Log feeding events to database
-                    from database.local_json_db import local_db
-                    feeding_info = {
-                        "status": feeding_status,
-                        "timestamp": arduino_data.get('timestamp', 0),
-                        "weight_kg": state.weight_kg,
-                        "battery_percent": state.battery_percent
-                    }
-                    local_db.save_data(feeding_info, "feeding_events")
-                
-                # Save to local JSON database (non-blocking)
-                from database.local_json_db import local_db
-                state.executor.submit(local_db.save_data, unified_data, "sensors")
-                
-                return unified_data
+        # Blocking read - returns as soon as a full line arrives or on timeout
+        chunk = state.arduino_serial.readline()
+        
+        # Timed out mid-line: keep the fragment for the next call
+        if not chunk.endswith(b'\n'):
+            state.serial_rx_buffer += chunk
+            return None
+        if state.serial_rx_buffer:
+            state.serial_rx_buffer += chunk
+            chunk = bytes(state.serial_rx_buffer)
+            state.serial_rx_buffer.clear()
+        line = chunk.strip()
+        
+        # Skip non-JSON lines instantly (menu text, etc.)
+        if not line.startswith(b'{'):
+            return None
                 
-            except orjson.JSONDecodeError as e:
-                logger.warning(f"JSON parse error: {e}, Line: {line[:100]}")
-                return None
+        # Parse JSON data (orjson validates UTF-8 itself, no decode pass needed)
+        try:
+            arduino_data = orjson.loads(line)
+            
+            # Update last response time for connection monitoring
+            state.last_arduino_response = time.time()
+            
+            # Update system state
+            state.update_sensor_data(arduino_data)
+            
+            # Smart Data Change Detection (avoid duplicate processing)
+            unified_data = state.get_unified_data()
+            if unified_data == state.last_unified_data:
+                return unified_data  # Same data, skip heavy processing
+            state.last_unified_data = unified_data
+            
+            # Process camera commands from Arduino (off the reader thread)
+            if 'command' in arduino_data:
+                state.executor.submit(handle_camera_command, arduino_data['command'])
+            
+            # Smart logging for sensor data (skip formatting in quiet mode)
+            if not config.HIDE_SENSOR_DATA and logger.isEnabledFor(logging.INFO):
+                weight = unified_data.get('weight_kg', 0)
+                temp = unified_data.get('temp_feed_tank', 0)
+                battery = unified_data.get('battery_percent', 0)
+                logger.info(f"Arduino data parsed: Weight={weight}kg, Temp={temp}°C, Battery={battery}%")
+            
+            # Process feeding status updates
+            if 'feeding_status' in arduino_data:
+                feeding_status = arduino_data['feeding_status']
+                logger.info(f"Feeding status: {feeding_status}")
                 
+                # Log feeding events to database
+                feeding_info = {
+                    "status": feeding_status,
+                    "timestamp": arduino_data.get('timestamp', 0),
+                    "weight_kg": state.weight_kg,
+                    "battery_percent": state.battery_percent
+                }
+                state.io_executor.submit(local_db.save_data, feeding_info, "feeding_events")
+            
+            # Save to local JSON database (non-blocking, single writer thread)
+            state.io_executor.submit(local_db.save_data, unified_data, "sensors")
+            
+            return unified_data
+            
+        except orjson.JSONDecodeError as e:
+            logger.warning(f"JSON parse error: {e}, Line: {line[:100].decode('utf-8', errors='replace')}")
+            return None
+            
     except Exception as e:
         logger.error(f"Arduino read error: {e}")
         state.arduino_connected = False
@@ -196,6 +258,27 @@ def read_arduino_data():
     
     return None
 
+def handle_camera_command(command):
+    """Handle camera commands sent by Arduino during feeding"""
+    try:
+        if command == 'start_camera_recording':
+            logger.info("Arduino requested camera recording start")
+            from camera.streaming import camera
+            if not camera.is_streaming:
+                threading.Thread(target=camera.generate_stream, daemon=True).start()
+            # Take a photo to mark feeding start
+            camera.take_photo()
+            
+        elif command == 'stop_camera_recording':
+            logger.info("Arduino requested camera recording stop")
+            from camera.streaming import camera
+            # Take a final photo to mark feeding end
+            camera.take_photo()
+            # Note: We keep streaming running for web interface
+            
+    except Exception as e:
+        logger.error(f"Camera command error: {e}")
+
 def send_arduino_command(command):
     """Send command to Arduino"""
     try:
@@ -203,16 +286,18 @@ def send_arduino_command(command):
             return False
             
         if isinstance(command, dict):
-            # Use orjson for faster serialization
-            command_str = orjson.dumps(command).decode()
+            # orjson emits bytes with the line terminator already appended
+            payload = orjson.dumps(command, option=orjson.OPT_APPEND_NEWLINE)
         else:
-            command_str = str(command)
+            payload = f"{command}\n".encode()
             
-        state.arduino_serial.write(f"{command_str}\n".encode())
+        # Whole-line writes: concurrent callers must not interleave bytes on the port
+        with state.serial_write_lock:
+            state.arduino_serial.write(payload)
         
         # Only log command if sensor data is not hidden
-        if not getattr(config, 'HIDE_SENSOR_DATA', False):
-            logger.info(f"Sent to Arduino: {command_str}")
+        if not config.HIDE_SENSOR_DATA:
+            logger.info(f"Sent to Arduino: {payload[:-1].decode()}")
         
         return True
         
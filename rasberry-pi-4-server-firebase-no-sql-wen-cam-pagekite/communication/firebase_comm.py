@@ -3,6 +3,8 @@
 """🔥 Firebase Communication Module"""
 
 import os
+import time
+import orjson
 import logging
 from datetime import datetime
 import firebase_admin
@@ -10,6 +12,8 @@ from firebase_admin import credentials, db
 
 from config import config
 from system.state_manager import state
+from system.monitoring import track_firebase_data_sent
+from communication.arduino_comm import send_arduino_command
 
 logger = logging.getLogger(__name__)
 
@@ -26,6 +30,7 @@ def init_firebase():
         })
         
         state.firebase_db = db
+        state.firebase_root_ref = db.reference('/')
         state.firebase_connected = True
         logger.info("Firebase connected")
         
@@ -38,6 +43,26 @@ def init_firebase():
         state.firebase_connected = False
         return False
 
+def close_firebase():
+    """Stop the /controls listener and release the Firebase app"""
+    state.firebase_connected = False
+    state.firebase_root_ref = None
+    
+    # The listener runs on its own session that delete_app() does not track
+    if state.firebase_listener:
+        try:
+            state.firebase_listener.close()
+            logger.info("Firebase /controls listener stopped")
+        except Exception as e:
+            logger.error(f"Firebase listener close error: {e}")
+        state.firebase_listener = None
+    
+    try:
+        firebase_admin.delete_app(firebase_admin.get_app())
+        logger.info("Firebase app released")
+    except ValueError:
+        pass  # Never initialized or already released
+
 def setup_firebase_listeners():
     """Setup Firebase realtime listeners"""
     if not state.firebase_connected:
@@ -51,7 +76,7 @@ def setup_firebase_listeners():
             logger.info(f"[FIREBASE CONTROL] Type: {type(event.data)}")
             
             # Check timestamp to avoid old commands
-            current_time = datetime.now().timestamp() * 1000  # milliseconds
+            current_time = time.time_ns() // 1_000_000  # epoch milliseconds, integer path (no datetime/float)
             event_timestamp = event.data.get('timestamp', 0)
             
             # Skip commands older than 30 seconds (30000 ms)
@@ -77,7 +102,6 @@ def setup_firebase_listeners():
                     wrapped_command = arduino_command
                 
                 # Send to Arduino
-                from communication.arduino_comm import send_arduino_command
                 result = send_arduino_command(wrapped_command)
                 
                 # ALWAYS log Arduino command results
@@ -93,7 +117,7 @@ def setup_firebase_listeners():
     # Setup Firebase listeners
     try:
         controls_ref = db.reference('/controls')
-        controls_ref.listen(on_control_change)
+        state.firebase_listener = controls_ref.listen(on_control_change)
         logger.info("[FIREBASE CONTROL] Listener active - monitoring /controls path")
         logger.info("[FIREBASE CONTROL] Ready to receive commands from Web/Mobile app")
         
@@ -128,24 +152,18 @@ def update_firebase_sensors(sensor_data):
         }
         
         # Calculate data size for usage tracking
-        import json
-        data_size_bytes = len(json.dumps(firebase_data).encode('utf-8'))
+        data_size_bytes = len(orjson.dumps(firebase_data))
         
-        # Log sensor data being sent (only if not hidden)
-        if not getattr(config, 'HIDE_SENSOR_DATA', False):
+        # Log sensor data being sent (only if not hidden and INFO is enabled)
+        if not config.HIDE_SENSOR_DATA and logger.isEnabledFor(logging.INFO):
             logger.info(f"[FIREBASE] Sending structured data: Weight={sensor_data.get('weight_kg', 'N/A')}kg, "
                        f"Temp={sensor_data.get('temp_feed_tank', 'N/A')}C, Size={data_size_bytes} bytes")
         
         # Update Firebase root with nested structure
-        root_ref = state.firebase_db.reference('/')
-        root_ref.update(firebase_data)
+        state.firebase_root_ref.update(firebase_data)
         
         # Track Firebase data usage
-        try:
-            from system.monitoring import track_firebase_data_sent
-            track_firebase_data_sent(data_size_bytes)
-        except ImportError:
-            pass  # Monitoring not available
+        track_firebase_data_sent(data_size_bytes)
         
         logger.debug("[FIREBASE] Structured sensor data sent successfully")
         return True
@@ -11,6 +11,7 @@ class Config:
         # Arduino Configuration
         self.ARDUINO_PORTS = ['COM3', 'COM4', 'COM5', '/dev/ttyUSB0', '/dev/ttyACM0']
         self.ARDUINO_BAUDRATE = 115200
+        self.ARDUINO_READ_TIMEOUT = 0.2  # seconds, blocking readline wait
         self.AUTO_DETECT_PORT = True
         
         # Firebase Configuration  
@@ -25,6 +26,7 @@ class Config:
         # System Configuration
         self.FLASK_PORT = 5000
         self.WEBSOCKET_ENABLED = True
+        self.WEBSOCKET_EMIT_INTERVAL = 0.1  # seconds, max 10 sensor broadcasts/s
         self.HEARTBEAT_INTERVAL = 5  # faster heartbeat
         self.MAX_RETRY_ATTEMPTS = 3  # fewer retries for speed
         self.RESTART_DELAY = 1  # faster restart
@@ -2,18 +2,48 @@
 # -*- coding: utf-8 -*-
 """Local JSON Database System"""
 
-import json
 import os
+import time
+import shutil
+import orjson
 import logging
+import threading
 from datetime import datetime, timedelta
 
 logger = logging.getLogger(__name__)
 
+# os.writev / O_CLOEXEC are POSIX-only; Windows needs O_BINARY so "\n" is not turned into "\r\n"
+HAS_WRITEV = hasattr(os, 'writev')
+APPEND_FLAGS = (os.O_WRONLY | os.O_APPEND | os.O_CREAT |
+                getattr(os, 'O_CLOEXEC', 0) | getattr(os, 'O_BINARY', 0))
+# writev() rejects more buffers than IOV_MAX with EINVAL (1024 on Linux/macOS)
+try:
+    IOV_MAX = os.sysconf('SC_IOV_MAX') if HAS_WRITEV else 0
+except (ValueError, OSError):
+    IOV_MAX = 0
+if IOV_MAX <= 0:
+    IOV_MAX = 16  # POSIX minimum
+# fdatasync skips the metadata flush where available (Linux); fsync elsewhere
+SYNC_FILE_DATA = getattr(os, 'fdatasync', os.fsync)
+
+def _write_all(fd, data):
+    """os.write() until every byte is on disk (os.write may write less than asked)"""
+    view = memoryview(data)
+    while view:
+        view = view[os.write(fd, view):]
+
 class DateTimeJSONDatabase:
     """Local JSON Database with Date-Time Filename"""
     
-    def __init__(self, base_dir="fish_feeder_data"):
+    def __init__(self, base_dir="fish_feeder_data", batch_size=30, flush_interval=60):
         self.base_dir = base_dir
+        self.batch_size = batch_size          # entries buffered before a write
+        self.flush_interval = flush_interval  # seconds between flushes (save_data + heartbeat flush_if_due)
+        self._pending = {}                    # filename -> [entries]
+        self._pending_count = 0
+        self.max_pending = batch_size * 20    # per file, entries kept while writes keep failing
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
         self.ensure_directories()
     
     def ensure_directories(self):
@@ -29,62 +59,113 @@ class DateTimeJSONDatabase:
         for directory in directories:
             os.makedirs(directory, exist_ok=True)
     
-    def get_filename(self, data_type="sensors"):
+    def get_filename(self, data_type="sensors", now=None):
         """สร้างชื่อไฟล์ตามวันเวลา"""
-        now = datetime.now()
+        now = now or datetime.now()
         
-        # ใช้รายวัน (แนะนำ)
-        filename = f"{data_type}_{now.strftime('%Y-%m-%d')}.json"
+        # ใช้รายวัน (แนะนำ) - JSON Lines, หนึ่งบรรทัดต่อหนึ่งรายการ
+        filename = f"{data_type}_{now.strftime('%Y-%m-%d')}.jsonl"
         return filename
     
     def save_data(self, data, data_type="sensors"):
         """บันทึกข้อมูลพร้อม timestamp"""
-        filename = os.path.join(self.base_dir, data_type, self.get_filename(data_type))
+        now = datetime.now()
+        filename = os.path.join(self.base_dir, data_type, self.get_filename(data_type, now))
         
-        # เตรียมข้อมูลพร้อม timestamp
+        # เตรียมข้อมูลพร้อม timestamp (อ่านเวลาครั้งเดียว ทุก field ตรงกัน)
         entry = {
-            "timestamp": datetime.now().isoformat(),
-            "unix_timestamp": int(datetime.now().timestamp()),
-            "date": datetime.now().strftime('%Y-%m-%d'),
-            "time": datetime.now().strftime('%H:%M:%S'),
+            "timestamp": now.isoformat(),
+            "unix_timestamp": int(now.timestamp()),
+            "date": now.strftime('%Y-%m-%d'),
+            "time": now.strftime('%H:%M:%S'),
             "data": data
         }
         
-        # อ่านไฟล์เก่า (ถ้ามี)
-        existing_data = []
-        if os.path.exists(filename):
-            try:
-                with open(filename, 'r', encoding='utf-8') as f:
-                    existing_data = json.load(f)
-            except:
-                existing_data = []
-        
-        # เพิ่มข้อมูลใหม่
-        existing_data.append(entry)
+        # เก็บไว้ในบัฟเฟอร์ แล้วเขียนลงไฟล์เป็นชุด
+        with self._lock:
+            self._pending.setdefault(filename, []).append(entry)
+            self._pending_count += 1
+            if (self._pending_count >= self.batch_size or
+                    time.monotonic() - self._last_flush >= self.flush_interval):
+                self._flush_locked()
+    
+    def flush(self, sync=False):
+        """เขียนข้อมูลที่ค้างในบัฟเฟอร์ลงไฟล์ (sync=True: รอจนข้อมูลลงดิสก์จริง)"""
+        with self._lock:
+            self._flush_locked(sync)
+    
+    def flush_if_due(self):
+        """เขียนบัฟเฟอร์เมื่อครบ flush_interval (เรียกจาก heartbeat ตอนที่ Arduino เงียบ)"""
+        with self._lock:
+            if self._pending and time.monotonic() - self._last_flush >= self.flush_interval:
+                self._flush_locked()
+    
+    def _flush_locked(self, sync=False):
+        """Append all buffered entries, one write per file"""
+        pending, self._pending = self._pending, {}
+        self._pending_count = 0
+        self._last_flush = time.monotonic()
         
-        # บันทึกกลับไป
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(existing_data, f, ensure_ascii=False, indent=2)
+        for filename, entries in pending.items():
+            # ต่อท้ายไฟล์ ไม่ต้องอ่านข้อมูลเก่ากลับมา
+            try:
+                os.makedirs(os.path.dirname(filename), exist_ok=True)
+                lines = [orjson.dumps(entry, option=orjson.OPT_APPEND_NEWLINE) for entry in entries]
+                fd = os.open(filename, APPEND_FLAGS, 0o644)
+                try:
+                    self._write_lines(fd, lines)
+                    if sync:
+                        SYNC_FILE_DATA(fd)
+                finally:
+                    os.close(fd)
+                logger.debug(f"Saved {len(entries)} entries to: {filename}")
+            except Exception as e:
+                # เขียนไม่สำเร็จ: เก็บกลับเข้าบัฟเฟอร์เพื่อลองใหม่รอบหน้า (จำกัดจำนวนไม่ให้หน่วยความจำโต)
+                kept = entries[-self.max_pending:]
+                self._pending[filename] = kept
+                self._pending_count += len(kept)
+                logger.error(f"Failed to save {filename}: {e} ({len(kept)} entries kept for retry)")
+    
+    @staticmethod
+    def _write_lines(fd, lines):
+        """Gather-write encoded lines (IOV_MAX buffers per syscall), finishing any short write"""
+        if not HAS_WRITEV:  # Windows: no writev, one joined write
+            _write_all(fd, b''.join(lines))
+            return
         
-        logger.debug(f"Saved to: {filename}")
+        for start in range(0, len(lines), IOV_MAX):
+            chunk = lines[start:start + IOV_MAX]
+            written = os.writev(fd, chunk)
+            if written < sum(len(line) for line in chunk):
+                _write_all(fd, b''.join(chunk)[written:])
     
     def cleanup_old_files(self, days_to_keep=30):
         """ลบไฟล์เก่าเกิน 30 วัน"""
+        data_types = ['sensors', 'controls', 'logs', 'settings']
+        
+        # ลบทั้งหมด: ลบทั้ง folder แล้วสร้างใหม่ แทนการลบทีละไฟล์
+        if days_to_keep <= 0:
+            for data_type in data_types:
+                shutil.rmtree(os.path.join(self.base_dir, data_type), ignore_errors=True)
+            self.ensure_directories()
+            logger.info(f"Deleted all files in: {', '.join(data_types)}")
+            return
+        
         cutoff_date = datetime.now() - timedelta(days=days_to_keep)
         
-        for data_type in ['sensors', 'controls', 'logs', 'settings']:
-            data_dir = os.path.join(self.base_dir, data_type)
-            if not os.path.exists(data_dir):
+        cutoff_ts = cutoff_date.timestamp()
+        
+        for data_type in data_types:
+            try:
+                entries = list(os.scandir(os.path.join(self.base_dir, data_type)))
+            except FileNotFoundError:
                 continue
                 
-            for filename in os.listdir(data_dir):
-                file_path = os.path.join(data_dir, filename)
+            for entry in entries:
                 try:
-                    file_time = datetime.fromtimestamp(os.path.getctime(file_path))
-                    
-                    if file_time < cutoff_date:
-                        os.remove(file_path)
-                        logger.info(f"Deleted old file: {filename}")
+                    if entry.stat().st_ctime < cutoff_ts:
+                        os.remove(entry.path)
+                        logger.info(f"Deleted old file: {entry.name}")
                 except:
                     continue
 
@@ -92,10 +173,10 @@ class DateTimeJSONDatabase:
 local_db = DateTimeJSONDatabase()
 
 # ===== DATA BACKUP SYSTEM =====
-def get_backup_filepath():
+def get_backup_filepath(now=None):
     """Generate backup file path: data_backup/YYYY-MM-DD/HH.json"""
     from config import config
-    now = datetime.now()
+    now = now or datetime.now()
     date_dir = os.path.join(config.BACKUP_BASE_DIR, now.strftime('%Y-%m-%d'))
     os.makedirs(date_dir, exist_ok=True)
     
@@ -109,8 +190,9 @@ def backup_sensor_data(sensor_data):
         return False
     
     try:
-        filepath = get_backup_filepath()
-        timestamp = datetime.now().isoformat()
+        now = datetime.now()
+        filepath = get_backup_filepath(now)
+        timestamp = now.isoformat()
         
         # Prepare backup entry
         backup_entry = {
@@ -122,16 +204,16 @@ def backup_sensor_data(sensor_data):
         existing_data = []
         if os.path.exists(filepath):
             try:
-                with open(filepath, 'r', encoding='utf-8') as f:
+                with open(filepath, 'rb') as f:
                     content = f.read().strip()
                     if content:  # Only try to parse if file has content
-                        existing_data = json.loads(content)
+                        existing_data = orjson.loads(content)
                     else:
                         existing_data = []
-            except (json.JSONDecodeError, ValueError) as e:
+            except orjson.JSONDecodeError as e:
                 logger.warning(f"Corrupted backup file {filepath}, creating new one: {e}")
                 # Create backup of corrupted file
-                corrupted_backup = f"{filepath}.corrupted.{int(datetime.now().timestamp())}"
+                corrupted_backup = f"{filepath}.corrupted.{int(now.timestamp())}"
                 try:
                     os.rename(filepath, corrupted_backup)
                     logger.info(f"Moved corrupted file to: {corrupted_backup}")
@@ -147,13 +229,13 @@ def backup_sensor_data(sensor_data):
             existing_data = existing_data[-100:]
             # Only log if sensor data is not hidden
             from config import config
-            if not getattr(config, 'HIDE_SENSOR_DATA', False):
+            if not config.HIDE_SENSOR_DATA:
                 logger.info(f"Trimmed backup file to last 100 entries: {filepath}")
         
         # Write back to file with atomic operation
         temp_filepath = f"{filepath}.tmp"
-        with open(temp_filepath, 'w', encoding='utf-8') as f:
-            json.dump(existing_data, f, indent=2, ensure_ascii=False)
+        with open(temp_filepath, 'wb') as f:
+            f.write(orjson.dumps(existing_data, option=orjson.OPT_INDENT_2))
         
         # Atomic move
         os.replace(temp_filepath, filepath)
@@ -174,18 +256,18 @@ def backup_sensor_data(sensor_data):
 def cleanup_old_backups(days_to_keep=30):
     """Clean up backup files older than specified days"""
     from config import config
-    if not os.path.exists(config.BACKUP_BASE_DIR):
+    try:
+        entries = list(os.scandir(config.BACKUP_BASE_DIR))
+    except FileNotFoundError:
         return
     
     cutoff_date = datetime.now() - timedelta(days=days_to_keep)
     
-    for date_dir in os.listdir(config.BACKUP_BASE_DIR):
+    for entry in entries:
         try:
-            dir_date = datetime.strptime(date_dir, '%Y-%m-%d')
-            if dir_date < cutoff_date:
-                dir_path = os.path.join(config.BACKUP_BASE_DIR, date_dir)
-                import shutil
-                shutil.rmtree(dir_path)
-                logger.info(f"Cleaned up old backup: {date_dir}")
+            dir_date = datetime.strptime(entry.name, '%Y-%m-%d')
+            if dir_date < cutoff_date and entry.is_dir():
+                shutil.rmtree(entry.path)
+                logger.info(f"Cleaned up old backup: {entry.name}")
         except ValueError:
             continue  # Skip invalid directory names 
\ No newline at end of file
@@ -16,11 +16,14 @@ from datetime import datetime
 from concurrent.futures import ThreadPoolExecutor
 
 # ===== LOGGING SETUP =====
+# Same path /api/logs tails (LOG_FILE env var, default fish_feeder.log)
+from config.settings import LOG_FILE
+
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(levelname)s - %(message)s',
     handlers=[
-        logging.FileHandler('fish_feeder.log', encoding='utf-8'),
+        logging.FileHandler(LOG_FILE, encoding='utf-8'),
         logging.StreamHandler()
     ]
 )
@@ -32,11 +35,11 @@ try:
     from config import config
     
     # Import system management
-    from system import state, heartbeat_monitor
+    from system import state, heartbeat_monitor, flush_firebase_usage
     
     # Import communication modules
     from communication import (
-        connect_arduino, init_firebase, 
+        connect_arduino, init_firebase, close_firebase, 
         read_arduino_data, update_firebase_sensors
     )
     from communication.arduino_comm import check_arduino_connection
@@ -61,6 +64,7 @@ except ImportError as e:
 def arduino_auto_reconnect_loop():
     """Arduino auto-reconnect loop - checks every 1 second"""
     logger.info("🔄 Starting Arduino auto-reconnect monitor (1s interval)")
+    last_status_log = time.time()
     
     while state.running:
         try:
@@ -69,23 +73,20 @@ def arduino_auto_reconnect_loop():
             
             # Log status periodically (every 30 seconds)
             current_time = time.time()
-            if not hasattr(arduino_auto_reconnect_loop, 'last_status_log'):
-                arduino_auto_reconnect_loop.last_status_log = current_time
-            
-            if current_time - arduino_auto_reconnect_loop.last_status_log >= 30:
+            if current_time - last_status_log >= 30:
                 status = "✅ Connected" if connection_ok else "❌ Disconnected"
                 logger.info(f"🔄 Arduino status: {status} (auto-checking every 1s)")
-                arduino_auto_reconnect_loop.last_status_log = current_time
+                last_status_log = current_time
             
             # Sleep for 1 second before next check
-            time.sleep(1.0)
+            state.wait(1.0)
             
         except KeyboardInterrupt:
             logger.info("🔄 Arduino reconnect monitor shutting down...")
             break
         except Exception as e:
             logger.error(f"🔄 Arduino reconnect monitor error: {e}")
-            time.sleep(1.0)  # Continue checking even on error
+            state.wait(1.0)  # Continue checking even on error
 
 # ===== MAIN DATA PROCESSING LOOP =====
 def main_data_loop():
@@ -94,10 +95,12 @@ def main_data_loop():
     data_count = 0
     last_log_time = time.time()
     last_firebase_time = time.time()  # Track Firebase update timing
+    last_emit_time = 0.0
+    pending_emit = None  # Latest sensor data waiting for WebSocket broadcast
     
     while state.running:
         try:
-            # Read Arduino data only when connected
+            # Read Arduino data only when connected (blocks until a line arrives)
             if state.arduino_connected:
                 sensor_data = read_arduino_data()
                 
@@ -114,18 +117,24 @@ def main_data_loop():
                     # Firebase update every 1 second (reduced frequency)
                     if current_time - last_firebase_time >= 1.0:
                         state.executor.submit(update_firebase_sensors, sensor_data)
-                        state.executor.submit(backup_sensor_data, sensor_data)
+                        state.io_executor.submit(backup_sensor_data, sensor_data)
                         last_firebase_time = current_time
                     
-                    # INSTANT WebSocket broadcast (highest priority)
+                    # Queue for WebSocket broadcast (latest data wins)
                     if config.WEBSOCKET_ENABLED:
-                        sio.emit('sensor_data', sensor_data)
+                        pending_emit = sensor_data
+            else:
+                time.sleep(0.1)  # Wait for auto-reconnect
             
-            time.sleep(0.01)  # Ultra fast sync! 10ms loop
+            # Coalesced WebSocket broadcast - one emit per interval regardless of packet rate
+            if pending_emit is not None and time.time() - last_emit_time >= config.WEBSOCKET_EMIT_INTERVAL:
+                sio.emit('sensor_data', pending_emit)
+                pending_emit = None
+                last_emit_time = time.time()
             
         except KeyboardInterrupt:
             logger.info("Shutting down...")
-            state.running = False
+            state.stop()
             break
         except Exception as e:
             logger.error(f"Main loop error: {e}")
@@ -150,7 +159,7 @@ def kill_existing_processes():
 def signal_handler(signum, frame):
     """Handle system signals for graceful shutdown"""
     logger.info(f"Received signal {signum}, shutting down...")
-    state.running = False
+    state.stop()
     cleanup_on_exit()
     print("Force exit...")
     os._exit(0)  # Force immediate exit
@@ -163,9 +172,16 @@ def cleanup_on_exit():
         state.arduino_serial.close()
         logger.info("Arduino connection closed")
     
+    close_firebase()
+    
     if camera.camera:
         camera.stop_camera()
         logger.info("Camera stopped")
+    
+    # Drain queued local writes, then push buffered entries to disk
+    state.io_executor.shutdown(wait=True)
+    flush_firebase_usage()
+    local_db.flush(sync=True)
 
 # ===== MAIN FUNCTION =====
 def start_fish_feeder_system():
@@ -184,12 +200,17 @@ def start_fish_feeder_system():
     # Initialize connections
     logger.info("Initializing connections...")
     
+    # Arduino port probing and Firebase auth are independent - run them side by side
+    with ThreadPoolExecutor(max_workers=2) as startup_pool:
+        arduino_future = startup_pool.submit(connect_arduino)
+        firebase_future = startup_pool.submit(init_firebase)
+    
     # Connect to Arduino
-    if not connect_arduino():
+    if not arduino_future.result():
         logger.warning("Arduino not connected, will retry automatically")
     
     # Initialize Firebase
-    if not init_firebase():
+    if not firebase_future.result():
         logger.warning("Firebase not connected, running in offline mode")
     else:
         logger.info("[FIREBASE CONTROL] System ready to receive commands from Firebase")
@@ -1,6 +1,6 @@
 # System Management Package
 from .state_manager import SystemState, state
-from .monitoring import heartbeat_monitor, cleanup_old_backups
+from .monitoring import heartbeat_monitor, cleanup_old_backups, flush_firebase_usage
 from .watchdog import SystemWatchdog
 
-__all__ = ['SystemState', 'state', 'heartbeat_monitor', 'cleanup_old_backups', 'SystemWatchdog'] 
\ No newline at end of file
+__all__ = ['SystemState', 'state', 'heartbeat_monitor', 'cleanup_old_backups', 'flush_firebase_usage', 'SystemWatchdog'] 
\ No newline at end of file
@@ -7,10 +7,11 @@ import logging
 import threading
 from datetime import datetime, timedelta
 import psutil
-import json
+import orjson
 import os
 
 from .state_manager import state
+from database.local_json_db import local_db
 from config.constants import FIREBASE_FREE_LIMITS, PERFORMANCE_MODES
 
 logger = logging.getLogger(__name__)
@@ -26,13 +27,13 @@ def init_firebase_usage_tracker():
             "monthly_total_mb": 0,
             "daily_usage": {}
         }
-        with open(firebase_usage_file, 'w') as f:
-            json.dump(initial_data, f, indent=2)
+        with open(firebase_usage_file, 'wb') as f:
+            f.write(orjson.dumps(initial_data, option=orjson.OPT_INDENT_2))
     
     # Load existing data
     try:
-        with open(firebase_usage_file, 'r') as f:
-            return json.load(f)
+        with open(firebase_usage_file, 'rb') as f:
+            return orjson.loads(f.read())
     except:
         # Return default data if file is corrupted
         return {
@@ -41,50 +42,71 @@ def init_firebase_usage_tracker():
             "daily_usage": {}
         }
 
+# In-memory usage totals; persisted by the heartbeat instead of on every send
+_usage_lock = threading.Lock()
+_usage_data = None
+_usage_dirty = False
+
+# Limit checks are only needed at human timescales, not on every upload
+LIMIT_CHECK_INTERVAL = 60  # seconds
+_last_limit_check = 0.0
+
 def load_firebase_usage():
     """Load Firebase usage data"""
-    try:
-        with open(firebase_usage_file, 'r') as f:
-            return json.load(f)
-    except:
-        return init_firebase_usage_tracker()
+    global _usage_data
+    if _usage_data is None:
+        try:
+            with open(firebase_usage_file, 'rb') as f:
+                _usage_data = orjson.loads(f.read())
+        except:
+            _usage_data = init_firebase_usage_tracker()
+    return _usage_data
 
 def save_firebase_usage(usage_data):
     """Save Firebase usage data"""
     try:
-        with open(firebase_usage_file, 'w') as f:
-            json.dump(usage_data, f, indent=2)
+        with open(firebase_usage_file, 'wb') as f:
+            f.write(orjson.dumps(usage_data, option=orjson.OPT_INDENT_2))
     except Exception as e:
         logger.error(f"Failed to save Firebase usage: {e}")
 
+def flush_firebase_usage():
+    """Persist in-memory Firebase usage if it changed since the last flush"""
+    global _usage_dirty
+    with _usage_lock:
+        if _usage_dirty:
+            save_firebase_usage(_usage_data)
+            _usage_dirty = False
+
 def track_firebase_data_sent(data_size_bytes):
     """Track Firebase data sent"""
-    usage_data = load_firebase_usage()
+    global _usage_dirty, _last_limit_check
     today = datetime.now().strftime('%Y-%m-%d')
     
     # Convert bytes to MB
     data_size_mb = data_size_bytes / (1024 * 1024)
     
-    # Update daily usage
-    if today not in usage_data['daily_usage']:
-        usage_data['daily_usage'][today] = 0
-    
-    usage_data['daily_usage'][today] += data_size_mb
-    
-    # Update monthly total
-    current_month = datetime.now().strftime('%Y-%m')
-    if not usage_data['month_start'].startswith(current_month):
-        # New month - reset
-        usage_data['month_start'] = datetime.now().strftime('%Y-%m-01')
-        usage_data['daily_usage'] = {today: data_size_mb}
-        usage_data['monthly_total_mb'] = data_size_mb
-    else:
-        usage_data['monthly_total_mb'] = sum(usage_data['daily_usage'].values())
-    
-    save_firebase_usage(usage_data)
+    with _usage_lock:
+        usage_data = load_firebase_usage()
+        
+        # Update monthly total
+        current_month = today[:7]
+        if not usage_data['month_start'].startswith(current_month):
+            # New month - reset
+            usage_data['month_start'] = f"{current_month}-01"
+            usage_data['daily_usage'] = {}
+            usage_data['monthly_total_mb'] = 0
+        
+        # Update daily usage
+        usage_data['daily_usage'][today] = usage_data['daily_usage'].get(today, 0) + data_size_mb
+        usage_data['monthly_total_mb'] += data_size_mb
+        _usage_dirty = True
     
-    # Check limits and warn
-    check_firebase_limits(usage_data)
+    # Check limits and warn (throttled - usage moves slowly)
+    now = time.monotonic()
+    if now - _last_limit_check >= LIMIT_CHECK_INTERVAL:
+        _last_limit_check = now
+        check_firebase_limits(usage_data)
     
     return usage_data
 
@@ -148,7 +170,8 @@ def get_firebase_usage_report():
     
     # Calculate remaining bandwidth
     remaining_mb = limits['monthly_limit_mb'] - limits['monthly_usage_mb']
-    days_remaining = (datetime.now().replace(day=28) - datetime.now()).days + 1
+    now = datetime.now()
+    days_remaining = (now.replace(day=28) - now).days + 1
     daily_allowance = remaining_mb / max(days_remaining, 1)
     
     report = {
@@ -170,53 +193,43 @@ def heartbeat_monitor():
     # Initialize Firebase usage tracking
     init_firebase_usage_tracker()
     
+    # Cadence is tracked on the monotonic clock; heartbeat_count is reset by
+    # every sensor frame so it cannot be used for scheduling
+    last_status_log = time.monotonic()
+    last_usage_report = last_status_log
+    heartbeat_ref = None  # Built once Firebase is up, reused every beat
+    
     while state.running:
         try:
             state.heartbeat_count += 1
-            current_time = time.time()
+            now = time.monotonic()
             
             # System health checks
             memory_usage = psutil.virtual_memory().percent
             cpu_usage = psutil.cpu_percent(interval=1)
             
-            # Log system status every 2 heartbeats (60 seconds)
-            if state.heartbeat_count % 2 == 0:
+            # Log system status every 60 seconds
+            if now - last_status_log >= 60:
+                last_status_log = now
                 logger.info(f"System: CPU {cpu_usage:.1f}%, Memory {memory_usage:.1f}%, Mode: {state.performance_mode}")
-                
-                # Firebase usage report every hour
-                if state.heartbeat_count % 120 == 0:  # Every hour (120 * 30 seconds)
-                    report = get_firebase_usage_report()
-                    logger.info(f"Firebase Usage: {report['current_usage']['monthly_percent']:.1f}% monthly, "
-                              f"{report['remaining_bandwidth_mb']:.1f}MB remaining")
             
-            # Check Arduino connection heartbeat
-            if state.arduino_connected:
-                state.heartbeat_count += 1
-                
-                # If no data received for 10 seconds, mark as disconnected
-                if state.heartbeat_count > 200:  # 200 * 0.05s = 10 seconds
-                    logger.warning("Arduino heartbeat timeout, marking as disconnected")
-                    state.arduino_connected = False
-                    state.heartbeat_count = 0
-                    
-                    # Attempt reconnection
-                    try:
-                        from communication.arduino_comm import connect_arduino
-                        logger.info("Attempting to reconnect to Arduino...")
-                        if connect_arduino():
-                            logger.info("Arduino reconnected successfully")
-                        else:
-                            state.reconnect_attempts += 1
-                            logger.error(f"Arduino reconnection failed (attempt {state.reconnect_attempts})")
-                    except Exception as e:
-                        logger.error(f"Arduino reconnection error: {e}")
+            # Firebase usage report every hour
+            if now - last_usage_report >= 3600:
+                last_usage_report = now
+                report = get_firebase_usage_report()
+                logger.info(f"Firebase Usage: {report['current_usage']['monthly_percent']:.1f}% monthly, "
+                          f"{report['remaining_bandwidth_mb']:.1f}MB remaining")
+            
+            # Arduino disconnects are detected and reconnected by
+            # arduino_auto_reconnect_loop (check_arduino_connection)
             
             # Check Firebase connection
             if state.firebase_connected:
                 try:
                     # Test Firebase connection by updating status
                     if state.firebase_db:
-                        status_ref = state.firebase_db.reference('/status/heartbeat')
+                        if heartbeat_ref is None:
+                            heartbeat_ref = state.firebase_db.reference('/status/heartbeat')
                         heartbeat_data = {
                             'timestamp': datetime.now().isoformat(),
                             'pi_server_running': True,
@@ -224,50 +237,74 @@ def heartbeat_monitor():
                             'performance_mode': state.performance_mode,
                             'heartbeat_count': state.heartbeat_count
                         }
-                        status_ref.set(heartbeat_data)
+                        heartbeat_ref.set(heartbeat_data)
                         
                         # Track this data transmission
-                        data_size = len(json.dumps(heartbeat_data).encode('utf-8'))
+                        data_size = len(orjson.dumps(heartbeat_data))
                         track_firebase_data_sent(data_size)
                         
                 except Exception as e:
                     logger.error(f"Firebase heartbeat error: {e}")
                     state.firebase_connected = False
             
+            # Persist accumulated Firebase usage, and buffered database entries
+            # that no new Arduino frame has pushed out
+            flush_firebase_usage()
+            local_db.flush_if_due()
+            
             # Sleep for 30 seconds between heartbeat checks (reduced Firebase traffic)
-            time.sleep(30)
+            state.wait(30)
             
         except Exception as e:
             logger.error(f"Heartbeat monitor error: {e}")
-            time.sleep(10)  # Wait longer on error
+            state.wait(10)  # Wait longer on error
 
 def cleanup_old_backups(max_days=7):
     """Clean up old backup files to save disk space"""
     try:
         from config import config
-        import os
         
         data_dir = config.DATA_DIR
         backup_dir = os.path.join(data_dir, 'backups')
         
-        if not os.path.exists(backup_dir):
+        try:
+            entries = list(os.scandir(backup_dir))
+        except FileNotFoundError:
             return
         
-        cutoff_date = datetime.now() - timedelta(days=max_days)
+        cutoff_ts = (datetime.now() - timedelta(days=max_days)).timestamp()
         
-        for filename in os.listdir(backup_dir):
-            file_path = os.path.join(backup_dir, filename)
-            
-            if os.path.isfile(file_path):
-                file_time = datetime.fromtimestamp(os.path.getmtime(file_path))
+        for entry in entries:
+            if entry.is_file() and entry.stat().st_mtime < cutoff_ts:
+                os.remove(entry.path)
+                logger.info(f"Cleaned up old backup: {entry.name}")
                 
-                if file_time < cutoff_date:
-                    os.remove(file_path)
-                    logger.info(f"Cleaned up old backup: {filename}")
-                    
     except Exception as e:
         logger.error(f"Backup cleanup error: {e}")
 
+def tail_log_file(path, max_lines=100, block_size=8192):
+    """Read the last lines of a log file by seeking backwards from the end"""
+    if not os.path.exists(path):
+        return []
+    
+    with open(path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        position = f.tell()
+        blocks = []
+        newline_count = 0
+        
+        # Only read as many blocks as needed to cover max_lines
+        while position > 0 and newline_count <= max_lines:
+            read_size = min(block_size, position)
+            position -= read_size
+            f.seek(position)
+            block = f.read(read_size)
+            blocks.append(block)
+            newline_count += block.count(b'\n')
+    
+    data = b''.join(reversed(blocks))
+    return [line.decode('utf-8', errors='replace') for line in data.splitlines()[-max_lines:]]
+
 def start_monitoring_tasks():
     """Start background monitoring tasks"""
     logger.info("Starting monitoring tasks...")
@@ -281,10 +318,10 @@ def start_monitoring_tasks():
         while state.running:
             try:
                 cleanup_old_backups()
-                time.sleep(3600)  # Run every hour
+                state.wait(3600)  # Run every hour
             except Exception as e:
                 logger.error(f"Periodic cleanup error: {e}")
-                time.sleep(3600)
+                state.wait(3600)
     
     cleanup_thread = threading.Thread(target=periodic_cleanup, daemon=True)
     cleanup_thread.start()
@@ -2,6 +2,8 @@
 # -*- coding: utf-8 -*-
 """Fish Feeder System State Manager"""
 
+import time
+import threading
 from datetime import datetime
 from concurrent.futures import ThreadPoolExecutor
 
@@ -61,12 +63,38 @@ class SystemState:
         
         # Communication
         self.last_sensor_data = {}
+        self.last_unified_data = None  # Last unified snapshot, for duplicate detection
         self.arduino_serial = None
+        self.serial_rx_buffer = bytearray()  # Partial line carried across read timeouts
+        self.serial_write_lock = threading.Lock()  # One writer at a time (HTTP API, WebSocket, Firebase listener)
         self.firebase_db = None
+        self.firebase_root_ref = None  # Cached db.reference('/') for sensor uploads
+        self.firebase_listener = None  # ListenerRegistration for /controls, closed on exit
         self.running = True
+        self.shutdown_event = threading.Event()  # Wakes sleeping background loops on stop()
         self.heartbeat_count = 0
         self.reconnect_attempts = 0
+        self.last_arduino_response = 0.0  # time.time() of last valid Arduino frame
+        self.start_time = time.monotonic()  # For get_uptime()
         self.executor = ThreadPoolExecutor(max_workers=4)
+        self.io_executor = ThreadPoolExecutor(max_workers=1)  # Single writer for local JSON files
+    
+    def stop(self):
+        """Signal all background loops to exit"""
+        self.running = False
+        self.shutdown_event.set()
+    
+    def wait(self, seconds):
+        """Sleep up to `seconds`, returning early (True) if the system is stopping"""
+        return self.shutdown_event.wait(seconds)
+    
+    def get_timestamp(self):
+        """Current local time as ISO 8601 string"""
+        return datetime.now().isoformat()
+    
+    def get_uptime(self):
+        """Seconds since the Pi server started"""
+        return round(time.monotonic() - self.start_time, 1)
     
     def get_status_dict(self):
         """Get system status as dictionary"""
@@ -86,55 +114,55 @@ class SystemState:
         if not sensor_data:
             return
         
-        # Extract sensor data (unified naming)
-        if 'sensors' in sensor_data:
-            sensors = sensor_data['sensors']
-            
+        # Extract sensor data (unified naming) - bind each sub-dict once
+        sensors = sensor_data.get('sensors')
+        if sensors is not None:
             # Temperature & Humidity from feed tank
-            if 'feed_tank' in sensors:
-                self.temp_feed_tank = sensors['feed_tank'].get('temperature', 0)
-                self.humidity_feed_tank = sensors['feed_tank'].get('humidity', 0)
+            feed_tank = sensors.get('feed_tank')
+            if feed_tank is not None:
+                self.temp_feed_tank = feed_tank.get('temperature', 0)
+                self.humidity_feed_tank = feed_tank.get('humidity', 0)
             
             # Temperature & Humidity from control box  
-            if 'control_box' in sensors:
-                self.temp_control_box = sensors['control_box'].get('temperature', 0)
-                self.humidity_control_box = sensors['control_box'].get('humidity', 0)
+            control_box = sensors.get('control_box')
+            if control_box is not None:
+                self.temp_control_box = control_box.get('temperature', 0)
+                self.humidity_control_box = control_box.get('humidity', 0)
             
             # Weight system
             self.weight_kg = sensors.get('weight_kg', 0)
             self.soil_moisture_percent = sensors.get('soil_moisture_percent', 0)
             
             # Power system
-            if 'power' in sensors:
-                power = sensors['power']
+            power = sensors.get('power')
+            if power is not None:
                 self.solar_voltage = power.get('solar_voltage', 0)
                 self.solar_current = power.get('solar_current', 0)
                 self.load_voltage = power.get('load_voltage', 0)
                 self.load_current = power.get('load_current', 0)
-                self.battery_status = power.get('battery_status', 'unknown')
+                battery_status = self.battery_status = power.get('battery_status', 'unknown')
                 
                 # Calculate battery percentage from status
                 try:
-                    if self.battery_status != "กำลังชาร์จ..." and self.battery_status != "unknown":
-                        self.battery_percent = int(float(self.battery_status))
+                    if battery_status not in ("กำลังชาร์จ...", "unknown"):
+                        self.battery_percent = int(float(battery_status))
                     else:
                         self.battery_percent = 0
                 except:
                     self.battery_percent = 0
         
         # Extract control data (unified naming)
-        if 'controls' in sensor_data:
-            controls = sensor_data['controls']
-            
+        controls = sensor_data.get('controls')
+        if controls is not None:
             # Relays
-            if 'relays' in controls:
-                relays = controls['relays']
+            relays = controls.get('relays')
+            if relays is not None:
                 self.relay_led_pond = relays.get('led_pond_light', False)
                 self.relay_fan_box = relays.get('control_box_fan', False)
             
             # Motors
-            if 'motors' in controls:
-                motors = controls['motors']
+            motors = controls.get('motors')
+            if motors is not None:
                 self.motor_blower_pwm = motors.get('blower_ventilation', 0)
                 self.motor_auger_pwm = motors.get('auger_food_dispenser', 0)  
                 self.motor_actuator_pwm = motors.get('actuator_feeder', 0)
@@ -144,8 +172,8 @@ class SystemState:
         self.system_uptime_sec = sensor_data.get('uptime_sec', 0)
         
         # Extract timing settings
-        if 'timing_settings' in sensor_data:
-            timing = sensor_data['timing_settings']
+        timing = sensor_data.get('timing_settings')
+        if timing is not None:
             self.actuator_up_sec = timing.get('actuator_up_sec', 3)
             self.actuator_down_sec = timing.get('actuator_down_sec', 2)
             self.feed_duration_sec = timing.get('feed_duration_sec', 5)
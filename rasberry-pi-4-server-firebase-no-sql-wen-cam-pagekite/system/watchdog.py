@@ -2,7 +2,6 @@
 # -*- coding: utf-8 -*-
 """System Watchdog Module for Fish Feeder"""
 
-import time
 import logging
 import threading
 import psutil
@@ -53,11 +52,11 @@ class SystemWatchdog:
                 self._check_temperature()
                 self._check_process_health()
                 
-                time.sleep(self.check_interval)
+                state.wait(self.check_interval)
                 
             except Exception as e:
                 logger.error(f"Watchdog monitoring error: {e}")
-                time.sleep(60)  # Wait longer on error
+                state.wait(60)  # Wait longer on error
                 
     def _check_memory(self):
         """Check memory usage"""
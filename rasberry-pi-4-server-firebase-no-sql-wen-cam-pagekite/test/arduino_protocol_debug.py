@@ -2,10 +2,13 @@
 # -*- coding: utf-8 -*-
 """Arduino Protocol Debug Tool"""
 
+import os
 import time
+import signal
 import serial
 import orjson
 import logging
+import threading
 from communication.arduino_comm import auto_detect_arduino_port, connect_arduino
 from communication.firebase_comm import init_firebase
 from system.state_manager import state
@@ -148,21 +151,34 @@ def test_firebase_to_arduino_flow():
                 except Exception as e:
                     print(f"❌ Forward error: {e}")
     
+    # Park the main thread until Ctrl+C instead of polling the listener
+    stop_event = threading.Event()
+    previous_handler = signal.getsignal(signal.SIGINT)
+    listener = None
+    
     try:
         ref = state.firebase_db.reference('/controls')
-        ref.listen(test_control_change)
+        listener = ref.listen(test_control_change)
         print("✅ Firebase listener active")
         print("Now try controlling from web interface...")
         print("Press Ctrl+C to stop")
         
-        # Keep listening
-        while True:
-            time.sleep(1)
-            
-    except KeyboardInterrupt:
+        # Keep listening until Ctrl+C sets the event
+        signal.signal(signal.SIGINT, lambda signum, frame: stop_event.set())
+        if os.name == 'nt':
+            # Lock waits can't be interrupted on Windows - wake to let the handler run
+            while not stop_event.wait(1.0):
+                pass
+        else:
+            stop_event.wait()
         print("\n⏹️  Test stopped")
+            
     except Exception as e:
         print(f"❌ Firebase listener error: {e}")
+    finally:
+        signal.signal(signal.SIGINT, previous_handler)
+        if listener:
+            listener.close()
 
 def main():
     """Main debug function"""
@@ -27,17 +27,15 @@ def clear_firebase_controls():
         return False
     
     try:
-        # Clear controls path
-        controls_ref = state.firebase_db.reference('/controls')
-        controls_ref.delete()
-        print("✅ Cleared /controls path")
-        
-        # Add timestamp marker
-        timestamp_ref = state.firebase_db.reference('/system/last_cleared')
-        timestamp_ref.set({
-            'timestamp': datetime.now().isoformat(),
-            'reason': 'Clear old control commands - Fix auto blower'
+        # Clear controls path and add timestamp marker in one multi-path update
+        state.firebase_db.reference('/').update({
+            'controls': None,
+            'system/last_cleared': {
+                'timestamp': datetime.now().isoformat(),
+                'reason': 'Clear old control commands - Fix auto blower'
+            }
         })
+        print("✅ Cleared /controls path")
         print("✅ Added clear timestamp marker")
         
         print("🎉 Firebase controls cleared successfully!")
@@ -17,13 +17,16 @@ from system.state_manager import state
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Arduino debug lines start with one of these tags (see controls.cpp)
+DEBUG_TAGS = ('[TOOL]', '[AUGER]', '[ACTUATOR]', '[BLOWER]', '[RELAY]')
+
 def test_all_controls():
     """Test all control systems in Fish Feeder"""
     print("=== Fish Feeder Complete Control Test ===")
     
     try:
         # Connect to Arduino
-        ser = serial.Serial('COM3', 115200, timeout=2)
+        ser = serial.Serial('COM3', 115200, timeout=0.5)
         time.sleep(2)
         print("✅ Connected to Arduino")
         
@@ -166,7 +169,7 @@ def test_all_controls():
             # Read response
             responses = read_arduino_responses(ser, timeout=2)
             for response in responses:
-                if any(keyword in response for keyword in ['[TOOL]', '[AUGER]', '[ACTUATOR]', '[BLOWER]', '[RELAY]']):
+                if response.startswith(DEBUG_TAGS):
                     print(f"    [DEBUG] {response}")
         
         print("\n" + "="*50)
@@ -233,8 +236,7 @@ def send_and_check_command(ser, cmd, control_name, expected_value, is_relay=Fals
     ser.write(f"{cmd_str}\n".encode())
     print(f"    📤 Sent: {cmd_str}")
     
-    time.sleep(1)  # Wait for processing
-    
+    # Responses are buffered by the port, so start reading right away
     responses = read_arduino_responses(ser, timeout=2)
     json_found = False
     
@@ -259,7 +261,7 @@ def send_and_check_command(ser, cmd, control_name, expected_value, is_relay=Fals
                 pass
         else:
             # Show debug messages
-            if any(keyword in response for keyword in ['[TOOL]', '[AUGER]', '[ACTUATOR]', '[BLOWER]', '[RELAY]']):
+            if response.startswith(DEBUG_TAGS):
                 print(f"    [DEBUG] {response}")
     
     if not json_found:
@@ -268,14 +270,13 @@ def send_and_check_command(ser, cmd, control_name, expected_value, is_relay=Fals
 def read_arduino_responses(ser, timeout=2):
     """Read all available responses from Arduino"""
     responses = []
-    end_time = time.time() + timeout
+    end_time = time.monotonic() + timeout
     
-    while time.time() < end_time:
-        if ser.in_waiting > 0:
-            line = ser.readline().decode('utf-8', errors='ignore').strip()
-            if line:
-                responses.append(line)
-        time.sleep(0.1)
+    # readline() blocks until a line arrives (0.5s port timeout) - no in_waiting polling
+    while time.monotonic() < end_time:
+        line = ser.readline().decode('utf-8', errors='ignore').strip()
+        if line:
+            responses.append(line)
     
     return responses
 
@@ -285,7 +286,6 @@ def check_final_status(ser):
     
     # Request status
     ser.write(b'STATUS\n')
-    time.sleep(1)
     
     responses = read_arduino_responses(ser, timeout=2)
     
@@ -332,29 +332,26 @@ def check_current_status():
     print("\n=== Current System Status ===")
     
     try:
-        ser = serial.Serial('COM3', 115200, timeout=2)
+        ser = serial.Serial('COM3', 115200, timeout=0.5)
         time.sleep(2)
         
         # Request status
         ser.write(b'STATUS\n')
-        time.sleep(1)
         
-        responses = read_arduino_responses(ser, timeout=2)
+        responses = read_arduino_responses(ser, timeout=3)
         
         for response in responses:
             if response.startswith('{'):
                 try:
                     data = orjson.loads(response)
                     
-                    print("Motors:")
-                    motors = data.get('controls', {}).get('motors', {})
-                    for motor, value in motors.items():
-                        print(f"  {motor}: {value}")
-                    
-                    print("Relays:")
-                    relays = data.get('controls', {}).get('relays', {})
-                    for relay, state in relays.items():
-                        print(f"  {relay}: {state}")
+                    # Render the whole report, then write it once
+                    controls = data.get('controls', {})
+                    lines = ["Motors:"]
+                    lines += [f"  {motor}: {value}" for motor, value in controls.get('motors', {}).items()]
+                    lines.append("Relays:")
+                    lines += [f"  {relay}: {value}" for relay, value in controls.get('relays', {}).items()]
+                    print("\n".join(lines))
                     
                     break
                 except orjson.JSONDecodeError:
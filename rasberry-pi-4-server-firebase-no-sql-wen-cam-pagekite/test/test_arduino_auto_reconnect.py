@@ -3,7 +3,6 @@
 """Test Arduino Auto-Reconnect System"""
 
 import sys
-import time
 import logging
 sys.path.append('..')
 
@@ -56,7 +55,6 @@ def test_auto_reconnect():
         result = check_arduino_connection()
         status = "✅ Connected" if result else "❌ Disconnected"
         print(f"   Attempt {i+1}: {status}")
-        time.sleep(0.5)
     
     print("\n" + "=" * 50)
     print("🔄 Auto-Reconnect Test Complete!")
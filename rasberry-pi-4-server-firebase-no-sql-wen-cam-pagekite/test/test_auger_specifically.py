@@ -6,6 +6,10 @@ import time
 import serial
 import orjson
 
+# Arduino debug lines start with one of these tags (see controls.cpp)
+AUGER_DEBUG_TAGS = ('[TOOL]', '[AUGER]')
+FEEDING_DEBUG_TAGS = ('[TOOL]', '[AUGER]', '[ACTUATOR]')
+
 def test_auger_commands():
     """Test auger_food_dispenser specifically"""
     print("=== Auger Food Dispenser Test ===")
@@ -44,9 +48,7 @@ def test_auger_commands():
             ser.write(f"{cmd_str}\n".encode())
             print(f"📤 Sent: {cmd_str}")
             
-            # Wait for response
-            time.sleep(3)  # Longer wait for motor response
-            
+            # Collect responses (buffered by the port while the motor runs)
             responses = []
             timeout = time.time() + 3
             while time.time() < timeout:
@@ -74,7 +76,7 @@ def test_auger_commands():
                     except:
                         pass
                 else:
-                    if '[TOOL]' in response or '[AUGER]' in response:
+                    if response.startswith(AUGER_DEBUG_TAGS):
                         print(f"  [DEBUG] {response}")
             
             if not json_found:
@@ -105,7 +107,7 @@ def test_auger_commands():
             # Read response
             if ser.in_waiting > 0:
                 response = ser.readline().decode('utf-8', errors='ignore').strip()
-                if '[TOOL]' in response or '[AUGER]' in response or '[ACTUATOR]' in response:
+                if response.startswith(FEEDING_DEBUG_TAGS):
                     print(f"  [DEBUG] {response}")
         
         print(f"\n🎉 Auger test completed!")
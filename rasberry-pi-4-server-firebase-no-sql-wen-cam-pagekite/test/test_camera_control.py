@@ -10,6 +10,9 @@ import requests
 import time
 import json
 
+# One pooled keep-alive connection for all API calls below
+session = requests.Session()
+
 def test_camera_api():
     """Test camera control API endpoints"""
     base_url = "http://localhost:5000"
@@ -20,7 +23,7 @@ def test_camera_api():
     # Test 1: Check camera status
     print("\n🔍 Test 1: Camera Status")
     try:
-        response = requests.get(f"{base_url}/api/camera/status", timeout=5)
+        response = session.get(f"{base_url}/api/camera/status", timeout=5)
         if response.status_code == 200:
             status = response.json()
             print(f"✅ Camera status: {json.dumps(status, indent=2)}")
@@ -36,7 +39,7 @@ def test_camera_api():
     print("\n🎥 Test 2: Start Camera")
     try:
         payload = {"action": "start"}
-        response = requests.post(f"{base_url}/api/control/camera", 
+        response = session.post(f"{base_url}/api/control/camera", 
                                json=payload, timeout=10)
         if response.status_code == 200:
             result = response.json()
@@ -55,7 +58,7 @@ def test_camera_api():
     print("\n📸 Test 3: Take Photo")
     try:
         payload = {"action": "photo"}
-        response = requests.post(f"{base_url}/api/control/camera", 
+        response = session.post(f"{base_url}/api/control/camera", 
                                json=payload, timeout=10)
         if response.status_code == 200:
             result = response.json()
@@ -75,11 +78,12 @@ def test_camera_api():
         print("   Open this URL in browser to view live stream")
         
         # Quick check if stream responds
-        response = requests.get(stream_url, timeout=5, stream=True)
+        response = session.get(stream_url, timeout=5, stream=True)
         if response.status_code == 200:
             print("✅ Stream endpoint responding")
         else:
             print(f"❌ Stream not available: {response.status_code}")
+        response.close()  # Stop the MJPEG stream so the connection isn't held open
     except Exception as e:
         print(f"⚠️ Stream check error: {e}")
     
@@ -87,7 +91,7 @@ def test_camera_api():
     print("\n🛑 Test 5: Stop Camera")
     try:
         payload = {"action": "stop"}
-        response = requests.post(f"{base_url}/api/control/camera", 
+        response = session.post(f"{base_url}/api/control/camera", 
                                json=payload, timeout=10)
         if response.status_code == 200:
             result = response.json()
@@ -101,7 +105,7 @@ def test_camera_api():
     # Test 6: Final status check
     print("\n📊 Test 6: Final Status")
     try:
-        response = requests.get(f"{base_url}/api/camera/status", timeout=5)
+        response = session.get(f"{base_url}/api/camera/status", timeout=5)
         if response.status_code == 200:
             status = response.json()
             print(f"✅ Final status: Streaming={status.get('streaming')}, Active={status.get('camera_active')}")
@@ -18,7 +18,8 @@ def test_com3_direct():
             print(f"\nTesting COM3 at {baud} baud...")
             
             try:
-                ser = serial.Serial('COM3', baud, timeout=2)
+                # Short read timeout: readline() wakes on each line, the loops below enforce the deadline
+                ser = serial.Serial('COM3', baud, timeout=0.5)
                 time.sleep(2)  # Arduino reset time
                 
                 print(f"✅ COM3 opened at {baud} baud")
@@ -30,19 +31,16 @@ def test_com3_direct():
                 # Send simple command
                 print("Sending STATUS command...")
                 ser.write(b'STATUS\n')
-                time.sleep(1)
                 
                 # Read responses
                 responses = []
-                timeout = time.time() + 5
+                deadline = time.monotonic() + 6
                 
-                while time.time() < timeout:
-                    if ser.in_waiting > 0:
-                        line = ser.readline().decode('utf-8', errors='ignore').strip()
-                        if line:
-                            responses.append(line)
-                            print(f"Response: {line}")
-                    time.sleep(0.1)
+                while time.monotonic() < deadline:
+                    line = ser.readline().decode('utf-8', errors='ignore').strip()
+                    if line:
+                        responses.append(line)
+                        print(f"Response: {line}")
                 
                 if responses:
                     print(f"✅ Arduino responding at {baud} baud!")
@@ -53,10 +51,12 @@ def test_com3_direct():
                     cmd_str = orjson.dumps(test_cmd).decode()
                     ser.write(f"{cmd_str}\n".encode())
                     
-                    time.sleep(2)
-                    if ser.in_waiting > 0:
+                    deadline = time.monotonic() + 2
+                    while time.monotonic() < deadline:
                         response = ser.readline().decode('utf-8', errors='ignore').strip()
-                        print(f"JSON response: {response}")
+                        if response:
+                            print(f"JSON response: {response}")
+                            break
                     
                     ser.close()
                     return baud  # Return working baud rate
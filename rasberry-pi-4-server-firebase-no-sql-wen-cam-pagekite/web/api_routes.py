@@ -2,41 +2,82 @@
 # -*- coding: utf-8 -*-
 """Fish Feeder API Routes - HTTP Endpoints"""
 
+import time
 import logging
+import orjson
 from flask import Flask, jsonify, request, Response
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
 
 from config import config
+from config.settings import LOG_FILE
 from system.state_manager import state
+from system.monitoring import tail_log_file
 from communication.arduino_comm import send_arduino_command
 from database.local_json_db import local_db
 from camera import camera
 
 logger = logging.getLogger(__name__)
 
+# ===== JSON PROVIDER =====
+class OrjsonProvider(DefaultJSONProvider):
+    """Encode jsonify() responses and decode request bodies with orjson instead of the stdlib json"""
+    
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=self.default, option=orjson.OPT_NON_STR_KEYS).decode()
+    
+    def response(self, *args, **kwargs):
+        # Build the body as bytes directly - no str round-trip
+        obj = self._prepare_response_obj(args, kwargs)
+        body = orjson.dumps(obj, default=self.default, option=orjson.OPT_NON_STR_KEYS)
+        return self._app.response_class(body, mimetype=self.mimetype)
+    
+    def loads(self, s, **kwargs):
+        # request.get_json() passes the raw body bytes - orjson parses them without a decode pass
+        return orjson.loads(s)
+
 # ===== FLASK APP SETUP =====
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
 CORS(app)
 
 # ===== HEALTH CHECK =====
+# Health is polled by monitors several times a second - serve the encoded body for up to 1s
+HEALTH_CACHE_TTL = 1.0  # seconds
+_health_cache = {'expires': 0.0, 'body': b''}
+
 @app.route('/api/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
-    return jsonify({
-        'status': 'running',
-        'arduino_connected': state.arduino_connected,
-        'firebase_connected': state.firebase_connected,
-        'timestamp': state.get_timestamp()
-    })
+    now = time.monotonic()
+    if now >= _health_cache['expires']:
+        _health_cache['body'] = orjson.dumps({
+            'status': 'running',
+            'arduino_connected': state.arduino_connected,
+            'firebase_connected': state.firebase_connected,
+            'timestamp': state.get_timestamp()
+        })
+        _health_cache['expires'] = now + HEALTH_CACHE_TTL
+    return Response(_health_cache['body'], mimetype='application/json')
 
 # ===== SENSOR DATA =====
+# (sensor dict, its encoded bytes) - every Arduino frame stores a new dict in
+# state.last_sensor_data, so the identity check tells when to re-encode
+_sensors_cache = (None, b'')
+
 @app.route('/api/sensors', methods=['GET'])
 def get_sensors():
     """Get current sensor data"""
-    return jsonify({
-        'data': state.last_sensor_data,
-        'timestamp': state.get_timestamp()
-    })
+    global _sensors_cache
+    data = state.last_sensor_data
+    cached_data, encoded = _sensors_cache
+    if data is not cached_data:
+        encoded = orjson.dumps(data)
+        _sensors_cache = (data, encoded)
+    
+    # Only the timestamp changes between frames - patch it into the cached body
+    body = b''.join((b'{"data":', encoded, b',"timestamp":', orjson.dumps(state.get_timestamp()), b'}'))
+    return Response(body, mimetype='application/json')
 
 @app.route('/api/sensors/history', methods=['GET'])
 def get_sensor_history():
@@ -49,18 +90,15 @@ def get_sensor_history():
 @app.route('/api/control', methods=['POST'])
 def send_control():
     """Send control command to Arduino"""
-    from config import config
-    
     try:
         command = request.get_json()
         if not command:
             return jsonify({'error': 'No command provided'}), 400
         
         # Only log control commands if sensor data is not hidden
-        if not getattr(config, 'HIDE_SENSOR_DATA', False):
+        if not config.HIDE_SENSOR_DATA:
             logger.info(f"[API] Control command received: {command}")
         
-        from communication.arduino_comm import send_arduino_command
         if send_arduino_command(command):
             return jsonify({'success': True, 'message': 'Command sent to Arduino'})
         else:
@@ -78,7 +116,7 @@ def control_camera():
         data = request.get_json() or {}
         action = data.get('action', 'photo')
         
-        if not getattr(config, 'HIDE_SENSOR_DATA', False):
+        if not config.HIDE_SENSOR_DATA:
             logger.info(f"[API] Camera control: {action}")
         
         if action == 'start':
@@ -172,10 +210,10 @@ def update_settings():
 # ===== LOGS =====
 @app.route('/api/logs', methods=['GET'])
 def get_logs():
-    """Get system logs"""
-    hours = request.args.get('hours', 1, type=int)
-    data = local_db.get_recent_data('logs', hours_back=hours)
-    return jsonify({'data': data, 'hours': hours})
+    """Get the most recent Pi server log lines"""
+    lines = min(max(request.args.get('lines', 100, type=int), 1), 1000)
+    data = tail_log_file(LOG_FILE, lines)
+    return jsonify({'data': data, 'lines': len(data)})
 
 # ===== STATUS =====
 @app.route('/api/status', methods=['GET'])
@@ -45,8 +45,6 @@ def disconnect(sid):
 @sio.event
 def send_command(sid, data):
     """Receive command from WebSocket client"""
-    from config import config
-    
     # ALWAYS log WebSocket commands (important for debugging)
     logger.info(f"[WEBSOCKET COMMAND] From {sid}: {data}")
     
@@ -61,14 +59,13 @@ def send_command(sid, data):
 @sio.event
 def camera_control(sid, data):
     """Handle camera control via WebSocket"""
-    from config import config
     from camera import camera
     
     try:
         action = data.get('action', 'status')
         
         # Only log camera commands if sensor data is not hidden
-        if not getattr(config, 'HIDE_SENSOR_DATA', False):
+        if not config.HIDE_SENSOR_DATA:
             logger.info(f"WebSocket camera control from {sid}: {action}")
         
         if action == 'start':